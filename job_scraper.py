@@ -5,295 +5,645 @@ More robust scraping with better error handling
 Author: Théo Collin
 """
 
-import requests
-import json
-import time
+import asyncio
+import aiohttp
+import hashlib
+import io
+import multiprocessing
+import orjson
 import os
+import random
+import re
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from html import unescape
+from typing import List, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+from xml.etree import ElementTree
 import google.generativeai as genai
-from urllib.parse import quote_plus, urlencode
+from google.api_core import exceptions as google_exceptions
+from aiohttp_client_cache import CachedSession, SQLiteBackend
+from aiolimiter import AsyncLimiter
+from datasketch import MinHash, MinHashLSH
+from jinja2 import Environment, FileSystemLoader
+from selectolax.lexbor import LexborHTMLParser
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+# Rate-limit and transient server responses worth retrying, and how long we accept to wait for one
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+MAX_RETRY_DELAY = 30
+
+# A list-page snippet at least this long is enough to analyze without the detail page
+MIN_PREVIEW_LENGTH = 600
+# Description bytes sent to Gemini per offer
+MAX_DESCRIPTION_BYTES = 1500
+
+# Offers matching no target field but an unrelated trade are scored without calling Gemini
+ON_TOPIC_RE = re.compile(
+    r'\b(?:op[ée]ration|supply chain|logisti|data|analy[sz]|analyst|project manag|chef de projet|'
+    r'gestion de projet|achat|procurement|strat[ée]g|business|consult|automati)',
+    re.IGNORECASE
+)
+OFF_TOPIC_RE = re.compile(
+    r'\b(?:commercia|vente|vendeu|sales|comptab|d[ée]veloppeu|developer|infirmi|cuisin|serveu|'
+    r'coiff|esth[ée]ti|b[âa]timent|btp|[ée]lectricien|m[ée]canicien)',
+    re.IGNORECASE
+)
+
+# Fixed part of every analysis prompt, sent once as the model's system instruction
+PROFILE_PROMPT = """Tu analyses des offres d'alternance et donnes à chacune un score sur 10 basé sur le profil suivant :
+
+PROFIL DU CANDIDAT :
+- Étudiant SKEMA Business School - Master Project Management & Supply Chain
+- Expérience : Strategy & Operations chez Snap Inc. et papernest
+- Compétences : Data analysis (SQL, Big Query, Looker Studio), Automatisation (Make, Axiom, IA)
+- Langues : Français (natif), Anglais (avancé), Espagnol (B2)
+- Cherche : Alternance en Operations, Supply Chain ou Project Management
+- Préférence : Start-ups/Scale-ups tech, mais ouvert aux grands groupes
+- Localisation : Paris, Région Parisienne, Lille (Remote est un plus)
+
+CRITÈRES DE SCORING :
+- Match avec le profil (compétences data, automatisation, operations)
+- Type d'entreprise (Start-up/Scale-up = bonus, Grand groupe = acceptable)
+- Mission (opérations, supply chain, project management, data analysis)
+- Opportunités d'apprentissage et technologies utilisées
+- Red flags (stage déguisé, mission floue, surqualification requise)
+
+IMPORTANT : Sois GÉNÉREUX dans les scores. Un score de 7/10 signifie "intéressant à considérer", pas "match parfait".
+- 9-10/10 : Match excellent
+- 7-8/10 : Bon match, à considérer sérieusement  
+- 5-6/10 : Match partiel mais potentiel
+- 3-4/10 : Peu pertinent
+- 0-2/10 : Hors sujet
+
+RÉPONSE : une analyse par offre du tableau JSON, en reprenant son id. Verdict et recommandation en une phrase courte, 2 points forts et 2 points faibles au maximum.
+"""
+
+def truncate_utf8(text: str, max_bytes: int) -> str:
+    """Cut text to at most max_bytes of UTF-8 without splitting a character"""
+    return text.encode('utf-8')[:max_bytes].decode('utf-8', 'ignore')
+
+@lru_cache(maxsize=1024)
+def split_indeed_title(title: str) -> Tuple[str, str]:
+    """Split an Indeed "Title - Company" string, cached since feeds repeat items across searches"""
+    parts = title.split(' - ')
+    return parts[0], parts[1] if len(parts) > 1 else 'À identifier'
+
+# Page parsers below are module-level so the worker processes of parse_pool can run them
+
+# LinkedIn card fields: (CSS selector, attribute to read, or None for the text)
+LINKEDIN_CARD_FIELDS = {
+    'title': ('h3.base-search-card__title', None),
+    'company': ('h4.base-search-card__subtitle', None),
+    'location': ('span.job-search-card__location', None),
+    'link': ('a.base-card__full-link', 'href'),
+    'posted_date': ('time', 'datetime'),
+    'description_preview': ('p.job-search-card__snippet', None),
+}
+
+def parse_linkedin_html(html_content: bytes) -> List[Dict]:
+    """Parse LinkedIn job listings from HTML"""
+    tree = LexborHTMLParser(html_content)
+    jobs = []
+    
+    for job_card in tree.css('li'):
+        try:
+            job_data = {
+                'id': '',
+                'title': '',
+                'company': '',
+                'location': '',
+                'link': '',
+                'posted_date': '',
+                'description': '',
+                'description_preview': ''
+            }
+            
+            base_card = job_card.css_first('div.base-card')
+            if not (base_card and base_card.attributes.get('data-entity-urn')):
+                continue  # Not a job card, skip the field lookups
+            
+            job_id = base_card.attributes['data-entity-urn'].split(':')[-1]
+            job_data['id'] = f"linkedin_{job_id}"
+            
+            for field, (selector, attribute) in LINKEDIN_CARD_FIELDS.items():
+                elem = job_card.css_first(selector)
+                if elem is None:
+                    continue
+                if attribute:
+                    job_data[field] = elem.attributes.get(attribute) or ''
+                else:
+                    job_data[field] = elem.text().strip()
+            
+            if job_data['id'] and job_data['title'] and job_data['company']:
+                jobs.append(job_data)
+                
+        except Exception as e:
+            continue
+    
+    return jobs
+
+def parse_wttj_html(html_content: bytes, location: str) -> List[Dict]:
+    """Parse WTTJ HTML"""
+    tree = LexborHTMLParser(html_content)
+    jobs = []
+    
+    # WTTJ uses different selectors - look for job cards
+    job_elements = tree.css('a[href*="/fr/companies/"][href*="/jobs/"]')
+    
+    for elem in job_elements[:20]:  # Limit to first 20
+        try:
+            link = elem.attributes.get('href') or ''
+            if not link.startswith('http'):
+                link = 'https://www.welcometothejungle.com' + link
+            
+            # Extract info from the card
+            title_elem = elem.css_first('h3') or elem.css_first('h2')
+            title = title_elem.text().strip() if title_elem else 'Titre non disponible'
+            
+            # Generate ID from URL
+            job_id = hashlib.md5(link.encode()).hexdigest()[:12]
+            
+            job_data = {
+                'id': f"wttj_{job_id}",
+                'title': title,
+                'company': 'À identifier',  # Will be analyzed by AI
+                'location': location.capitalize(),
+                'link': link,
+                'posted_date': '',
+                'description': ''
+            }
+            
+            jobs.append(job_data)
+            
+        except Exception as e:
+            continue
+    
+    return jobs
+
+def parse_indeed_rss(xml_content: bytes, location: str) -> List[Dict]:
+    """Parse Indeed RSS feed, streaming over its <item> elements"""
+    jobs = []
+    
+    try:
+        for _, item in ElementTree.iterparse(io.BytesIO(xml_content), events=('end',)):
+            if item.tag != 'item':
+                continue
+            if len(jobs) == 20:  # Limit to 20
+                break
+            
+            title = item.findtext('title', '')
+            link = item.findtext('link', '')
+            description = item.findtext('description', '')
+            pub_date = item.findtext('pubDate', '')
+            item.clear()  # Drop the parsed item, only the extracted fields are kept
+            
+            job_title, company = split_indeed_title(title)
+            
+            job_id = hashlib.md5(link.encode()).hexdigest()[:12]
+            
+            job_data = {
+                'id': f"indeed_{job_id}",
+                'title': job_title,
+                'company': company,
+                'location': location,
+                'link': link,
+                'posted_date': pub_date,
+                'description': description[:500]  # Truncate
+            }
+            
+            jobs.append(job_data)
+    
+    except ElementTree.ParseError as e:
+        # Keep the items read before the feed turned malformed
+        print(f"   ⚠️ Malformed Indeed feed for {location}: {e}")
+    
+    return jobs
+
+# Google result blocks and the three fields read from each, matched on the raw page bytes
+GOOGLE_RESULT_RE = re.compile(rb'<div[^>]*\sclass="(?:[^"]*\s)?g(?:\s[^"]*)?"')
+GOOGLE_LINK_RE = re.compile(rb'<a[^>]*\shref="([^"]*)"')
+GOOGLE_TITLE_RE = re.compile(rb'<h3[^>]*>(.*?)</h3>', re.DOTALL)
+LINKEDIN_POST_LINK_RE = re.compile(rb'linkedin\.com/(?:posts|feed/update)/')
+GOOGLE_SNIPPET_RE = re.compile(rb'<div[^>]*\sclass="(?:[^"]*\s)?VwiC3b(?:\s[^"]*)?"[^>]*>(.*?)</div>', re.DOTALL)
+TAG_RE = re.compile(rb'<[^>]+>')
+
+def html_text(fragment: bytes) -> str:
+    """Text of a UTF-8 HTML fragment: tags dropped, entities decoded"""
+    return unescape(TAG_RE.sub(b'', fragment).decode('utf-8', 'replace')).strip()
+
+def parse_google_results(html_content: bytes) -> List[Dict]:
+    """Parse Google search results with a few regexes instead of building a DOM"""
+    jobs = []
+    
+    # Each result runs from its <div class="g"> to the next one
+    starts = [match.start() for match in GOOGLE_RESULT_RE.finditer(html_content)][:6]
+    if not starts:
+        return parse_google_results_dom(html_content)
+    results = [html_content[start:end] for start, end in zip(starts, starts[1:] + [None])]
+    
+    for result in results[:5]:  # Only first 5
+        try:
+            # Only LinkedIn posts matter, skip any other result before reading its fields
+            link_match = GOOGLE_LINK_RE.search(result)
+            if not (link_match and LINKEDIN_POST_LINK_RE.search(link_match.group(1))):
+                continue
+            
+            title_match = GOOGLE_TITLE_RE.search(result)
+            
+            if title_match:
+                link = unescape(link_match.group(1).decode('utf-8', 'replace'))
+                title = html_text(title_match.group(1))
+                
+                snippet_match = GOOGLE_SNIPPET_RE.search(result)
+                snippet = html_text(snippet_match.group(1)) if snippet_match else ''
+                
+                jobs.append(linkedin_post_job(link, title, snippet))
+        
+        except Exception as e:
+            continue
+    
+    return jobs
+
+def parse_google_results_dom(html_content: bytes) -> List[Dict]:
+    """Fallback for result pages without <div class="g"> blocks, e.g. Google's basic HTML version"""
+    tree = LexborHTMLParser(html_content)
+    jobs = []
+    seen_links = set()
+    
+    for anchor in tree.css('a[href]'):
+        link = anchor.attributes.get('href') or ''
+        if link.startswith('/url?'):
+            # Basic HTML results go through Google's redirect, the target is in q
+            link = parse_qs(urlsplit(link).query).get('q', [''])[0]
+        
+        title_elem = anchor.css_first('h3')
+        if not title_elem or link in seen_links or not LINKEDIN_POST_LINK_RE.search(link.encode()):
+            continue
+        
+        seen_links.add(link)
+        jobs.append(linkedin_post_job(link, title_elem.text().strip(), ''))
+        if len(jobs) == 5:  # Only first 5
+            break
+    
+    return jobs
+
+def linkedin_post_job(link: str, title: str, snippet: str) -> Dict:
+    """Job entry for a LinkedIn post found through Google"""
+    job_id = hashlib.md5(link.encode()).hexdigest()[:12]
+    
+    return {
+        'id': f"linkedin_post_{job_id}",
+        'title': title,
+        'company': 'À identifier',
+        'location': 'Paris',
+        'link': link,
+        'posted_date': '',
+        'description': snippet
+    }
+
+# Placeholder company names, normalized, set by the parsers that cannot read the company
+UNKNOWN_COMPANIES = {'', 'a identifier'}
+
+def normalize_text(text: str) -> str:
+    """Lowercase ASCII words only, so that accents and punctuation do not split duplicates"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.findall(r'[a-z0-9]+', ascii_text.lower()))
+
+# Fields Gemini must return for each offer, besides the offer's id
+ANALYSIS_FIELDS = {
+    'score': int,
+    'verdict': str,
+    'points_forts': list,
+    'points_faibles': list,
+    'recommandation': str,
+}
+
+def is_complete_analysis(analysis: Dict) -> bool:
+    """Whether an analysis returned by Gemini has every field, with the expected type"""
+    return (all(isinstance(analysis.get(field), kind) for field, kind in ANALYSIS_FIELDS.items())
+            and not isinstance(analysis['score'], bool))
+
+# Structured output expected from Gemini: one analysis per offer, every field required
+STRING_SCHEMA = genai.protos.Schema(type_=genai.protos.Type.STRING)
+STRING_LIST_SCHEMA = genai.protos.Schema(type_=genai.protos.Type.ARRAY, items=STRING_SCHEMA)
+JOB_ANALYSES_SCHEMA = genai.protos.Schema(
+    type_=genai.protos.Type.ARRAY,
+    items=genai.protos.Schema(
+        type_=genai.protos.Type.OBJECT,
+        properties={
+            'id': STRING_SCHEMA,
+            'score': genai.protos.Schema(type_=genai.protos.Type.INTEGER),
+            'verdict': STRING_SCHEMA,
+            'points_forts': STRING_LIST_SCHEMA,
+            'points_faibles': STRING_LIST_SCHEMA,
+            'recommandation': STRING_SCHEMA,
+        },
+        required=['id', *ANALYSIS_FIELDS]
+    )
+)
 
 class MultiSourceJobTracker:
+    LINKEDIN_SEARCH_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+    LINKEDIN_BASE_PARAMS = {
+        'f_WT': '2',
+        'f_TPR': 'r2592000',  # Last 30 days
+        'start': '0'
+    }
+    WTTJ_HEADERS = {'Accept': 'text/html,application/xhtml+xml'}
+    
     def __init__(self):
-        self.jobs_file = "jobs_database.json"
+        self.jobs_file = "jobs_database.jsonl"
+        self.legacy_jobs_file = "jobs_database.json"
+        self.cache_file = "analysis_cache.json"
+        self.http_cache_file = "http_cache.sqlite"
         self.config_file = "config.json"
         self.load_config()
         
+        # LinkedIn search parameters only depend on the config, build them once
+        self.linkedin_searches = [
+            (location, keyword, {
+                'keywords': f"{keyword} alternance",
+                'location': location,
+                **self.LINKEDIN_BASE_PARAMS
+            })
+            for location in self.config['locations']
+            for keyword in self.config['keywords']
+        ]
+        
+        # Worker processes for page parsing, set by run() while scraping
+        # (None runs the parsers on the event loop's default thread pool)
+        self.parse_pool = None
+        
+        # Requests in flight per site, shared by every scraper and retry hitting it
+        self.host_semaphores = {
+            'linkedin.com': asyncio.Semaphore(4),
+            'indeed.com': asyncio.Semaphore(4),
+            'welcometothejungle.com': asyncio.Semaphore(8),
+            'google.com': asyncio.Semaphore(2),
+        }
+        
         # Configure Gemini
         genai.configure(api_key=os.environ.get('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.ai_batch_size = 8
+        self.model_name = 'gemini-1.5-flash'
+        self.model = genai.GenerativeModel(
+            self.model_name,
+            system_instruction=PROFILE_PROMPT,
+            generation_config=genai.GenerationConfig(
+                response_mime_type='application/json',
+                response_schema=JOB_ANALYSES_SCHEMA,
+                temperature=0.2,
+                max_output_tokens=256 * self.ai_batch_size
+            )
+        )
+        
+        # Gemini quota: calls in flight and calls per minute
+        self.ai_semaphore = asyncio.Semaphore(10)
+        self.ai_limiter = AsyncLimiter(30, 60)
+        
+        # Compiled once, autoescaped since titles and companies come from scraped pages
+        self.report_template = Environment(
+            loader=FileSystemLoader(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')),
+            autoescape=True,
+            auto_reload=False,
+            trim_blocks=True,
+            lstrip_blocks=True
+        ).get_template('report.html.j2')
         
     def load_config(self):
         """Load search criteria from config file"""
-        with open(self.config_file, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+        with open(self.config_file, 'rb') as f:
+            self.config = orjson.loads(f.read())
+    
+    async def _fetch(self, session: aiohttp.ClientSession, url: str, headers: Dict = None, timeout: int = 10,
+                     params: Dict = None) -> bytes:
+        """GET a page on the shared session and return its raw body, backing off on transient failures"""
+        semaphore = self._host_semaphore(url)
+        
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with semaphore, session.get(url, params=params, headers=headers,
+                                                  timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        response.raise_for_status()
+                        return await response.read()
+                    delay = self._retry_delay(attempt, response)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                # Dropped keep-alive connections and timeouts are worth another try too
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = self._retry_delay(attempt)
+            
+            await asyncio.sleep(delay)
+    
+    async def parse_in_pool(self, parser, *args):
+        """Run a module-level parser in the worker processes, off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self.parse_pool, parser, *args)
+    
+    def _host_semaphore(self, url: str):
+        """Concurrency limit of the site serving url, or no limit for other hosts"""
+        host = urlsplit(url).hostname or ''
+        for domain, semaphore in self.host_semaphores.items():
+            if host == domain or host.endswith('.' + domain):
+                return semaphore
+        return nullcontext()
+    
+    def _retry_delay(self, attempt: int, response: aiohttp.ClientResponse = None) -> float:
+        """Exponential backoff with jitter, never shorter than the server's Retry-After"""
+        delay = min(2 ** attempt, MAX_RETRY_DELAY) + random.uniform(0, 1)
+        if response is None:
+            return delay
+        
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), MAX_RETRY_DELAY))
+        
+        return delay
     
     # ============================================
     # LINKEDIN JOBS SCRAPING (Working)
     # ============================================
     
-    def scrape_linkedin_jobs(self) -> List[Dict]:
+    async def scrape_linkedin_jobs(self, session: aiohttp.ClientSession) -> List[Dict]:
         """Scrape jobs from LinkedIn Jobs API"""
         print("\n🔵 Scraping LinkedIn Jobs...")
-        all_jobs = []
-        base_url = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
         
-        for location in self.config['locations']:
-            for keyword in self.config['keywords']:
-                params = {
-                    'keywords': f"{keyword} alternance",
-                    'location': location,
-                    'f_WT': '2',
-                    'f_TPR': 'r2592000',  # Last 30 days
-                    'start': '0'
-                }
-                
-                url = base_url + '?' + '&'.join([f"{k}={v}" for k, v in params.items()])
-                
-                try:
-                    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
-                    response = requests.get(url, headers=headers, timeout=10)
-                    response.raise_for_status()
-                    
-                    jobs = self.parse_linkedin_html(response.text)
-                    for job in jobs:
-                        job['source'] = 'LinkedIn Jobs'
-                    all_jobs.extend(jobs)
-                    
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    print(f"   ⚠️ Error with {keyword} in {location}: {e}")
-        
-        print(f"   ✅ Found {len(all_jobs)} jobs from LinkedIn")
+        async def fetch_search(location: str, keyword: str, params: Dict) -> bytes:
+            try:
+                return await self._fetch(session, self.LINKEDIN_SEARCH_URL, params=params)
+            except Exception as e:
+                print(f"   ⚠️ Error with {keyword} in {location}: {e}")
+                return b''
+        
+        pages = await asyncio.gather(*[
+            fetch_search(location, keyword, params)
+            for location, keyword, params in self.linkedin_searches
+        ])
+        
+        # Parsing is pure CPU work, spread the pages over all cores
+        results = await asyncio.gather(*[
+            self.parse_in_pool(parse_linkedin_html, html)
+            for html in pages if html
+        ])
+        
+        # The same job shows up under several (location, keyword) searches
+        listings = [job for jobs in results for job in jobs]
+        all_jobs = list({job['id']: job for job in listings}.values())
+        for job in all_jobs:
+            job['source'] = 'LinkedIn Jobs'
+        
+        print(f"   ✅ Found {len(all_jobs)} jobs from LinkedIn ({len(listings)} listings)")
         return all_jobs
     
-    def parse_linkedin_html(self, html_content: str) -> List[Dict]:
-        """Parse LinkedIn job listings from HTML"""
-        from bs4 import BeautifulSoup
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        jobs = []
+    async def get_job_details(self, session: aiohttp.ClientSession, job_id: str) -> str:
+        """Fetch the full description of a LinkedIn job"""
+        linkedin_id = job_id.replace('linkedin_', '', 1)
+        url = f"https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{linkedin_id}"
         
-        for job_card in soup.find_all('li'):
-            try:
-                job_data = {
-                    'id': '',
-                    'title': '',
-                    'company': '',
-                    'location': '',
-                    'link': '',
-                    'posted_date': '',
-                    'description': ''
-                }
-                
-                base_card = job_card.find('div', class_='base-card')
-                if base_card and base_card.get('data-entity-urn'):
-                    job_id = base_card.get('data-entity-urn').split(':')[-1]
-                    job_data['id'] = f"linkedin_{job_id}"
-                
-                title_elem = job_card.find('h3', class_='base-search-card__title')
-                if title_elem:
-                    job_data['title'] = title_elem.text.strip()
-                
-                company_elem = job_card.find('h4', class_='base-search-card__subtitle')
-                if company_elem:
-                    job_data['company'] = company_elem.text.strip()
-                
-                location_elem = job_card.find('span', class_='job-search-card__location')
-                if location_elem:
-                    job_data['location'] = location_elem.text.strip()
-                
-                link_elem = job_card.find('a', class_='base-card__full-link')
-                if link_elem:
-                    job_data['link'] = link_elem.get('href', '')
-                
-                time_elem = job_card.find('time')
-                if time_elem:
-                    job_data['posted_date'] = time_elem.get('datetime', '')
-                
-                if job_data['id'] and job_data['title'] and job_data['company']:
-                    jobs.append(job_data)
-                    
-            except Exception as e:
+        try:
+            html = await self._fetch(session, url)
+            description_elem = LexborHTMLParser(html).css_first('div.show-more-less-html__markup')
+            return description_elem.text(separator=' ', strip=True) if description_elem else ''
+        except Exception as e:
+            print(f"   ⚠️ Error fetching details for {job_id}: {e}")
+            return ''
+    
+    async def fetch_missing_descriptions(self, session: aiohttp.ClientSession, jobs: List[Dict]):
+        """Fill in LinkedIn descriptions, from the card snippet when long enough, else the detail page"""
+        missing = []
+        for job in jobs:
+            if job['source'] != 'LinkedIn Jobs' or job.get('description'):
                 continue
+            
+            preview = job.get('description_preview', '')
+            if len(preview) >= MIN_PREVIEW_LENGTH:
+                job['description'] = preview
+            else:
+                missing.append(job)
         
-        return jobs
+        if not missing:
+            return
+        
+        print(f"\n📄 Fetching {len(missing)} LinkedIn job descriptions...")
+        
+        descriptions = await asyncio.gather(*[self.get_job_details(session, job['id']) for job in missing])
+        for job, description in zip(missing, descriptions):
+            job['description'] = description
     
     # ============================================
     # WELCOME TO THE JUNGLE - Alternative approach
     # ============================================
     
-    def scrape_wttj_simple(self) -> List[Dict]:
+    async def scrape_wttj_simple(self, session: aiohttp.ClientSession) -> List[Dict]:
         """Scrape WTTJ using simple URL approach"""
         print("\n🟢 Scraping Welcome to the Jungle...")
-        all_jobs = []
         
-        # WTTJ simple search URLs
-        locations = ['paris', 'lille', 'lyon']
-        
-        for location in locations:
-            for keyword in ['alternance', 'apprentissage']:
-                try:
-                    # Direct URL to WTTJ search
-                    url = f"https://www.welcometothejungle.com/fr/jobs?query={keyword}&page=1&aroundQuery={location}"
-                    
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                        'Accept': 'text/html,application/xhtml+xml'
-                    }
-                    
-                    response = requests.get(url, headers=headers, timeout=15)
-                    
-                    if response.status_code == 200:
-                        jobs = self.parse_wttj_html(response.text, location)
-                        for job in jobs:
-                            job['source'] = 'Welcome to the Jungle'
-                        all_jobs.extend(jobs)
-                        print(f"   Found {len(jobs)} jobs for {keyword} in {location}")
-                    
-                    time.sleep(3)
-                    
-                except Exception as e:
-                    print(f"   ⚠️ Error with WTTJ {keyword}/{location}: {e}")
-        
-        print(f"   ✅ Total WTTJ: {len(all_jobs)} jobs")
-        return all_jobs
-    
-    def parse_wttj_html(self, html_content: str, location: str) -> List[Dict]:
-        """Parse WTTJ HTML"""
-        from bs4 import BeautifulSoup
-        import hashlib
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        jobs = []
-        
-        # WTTJ uses different selectors - look for job cards
-        job_elements = soup.find_all('a', href=lambda x: x and '/fr/companies/' in x and '/jobs/' in x)
-        
-        for elem in job_elements[:20]:  # Limit to first 20
+        async def fetch_search(location: str, keyword: str) -> List[Dict]:
             try:
-                link = elem.get('href', '')
-                if not link.startswith('http'):
-                    link = 'https://www.welcometothejungle.com' + link
+                # Direct URL to WTTJ search
+                url = "https://www.welcometothejungle.com/fr/jobs"
+                params = {'query': keyword, 'page': '1', 'aroundQuery': location}
                 
-                # Extract info from the card
-                title_elem = elem.find('h3') or elem.find('h2')
-                title = title_elem.text.strip() if title_elem else 'Titre non disponible'
+                html = await self._fetch(session, url, self.WTTJ_HEADERS, timeout=15, params=params)
                 
-                # Generate ID from URL
-                job_id = hashlib.md5(link.encode()).hexdigest()[:12]
-                
-                job_data = {
-                    'id': f"wttj_{job_id}",
-                    'title': title,
-                    'company': 'À identifier',  # Will be analyzed by AI
-                    'location': location.capitalize(),
-                    'link': link,
-                    'posted_date': '',
-                    'description': ''
-                }
-                
-                jobs.append(job_data)
+                jobs = await self.parse_in_pool(parse_wttj_html, html, location)
+                for job in jobs:
+                    job['source'] = 'Welcome to the Jungle'
+                print(f"   Found {len(jobs)} jobs for {keyword} in {location}")
+                return jobs
                 
             except Exception as e:
-                continue
+                print(f"   ⚠️ Error with WTTJ {keyword}/{location}: {e}")
+                return []
         
-        return jobs
+        # WTTJ simple search URLs
+        locations = ['paris', 'lille', 'lyon']
+        
+        results = await asyncio.gather(*[
+            fetch_search(location, keyword)
+            for location in locations
+            for keyword in ['alternance', 'apprentissage']
+        ])
+        all_jobs = [job for jobs in results for job in jobs]
+        
+        print(f"   ✅ Total WTTJ: {len(all_jobs)} jobs")
+        return all_jobs
     
     # ============================================
     # INDEED - Simplified approach
     # ============================================
     
-    def scrape_indeed_simple(self) -> List[Dict]:
+    async def scrape_indeed_simple(self, session: aiohttp.ClientSession) -> List[Dict]:
         """Scrape Indeed using RSS feed (more reliable)"""
         print("\n🔴 Scraping Indeed...")
-        all_jobs = []
-        
-        locations = ['Paris', 'Lille']
-        
-        for location in locations:
-            for keyword in ['alternance operations', 'alternance supply chain', 'alternance']:
-                try:
-                    # Indeed RSS feed (more stable than HTML scraping)
-                    params = {
-                        'q': keyword,
-                        'l': location,
-                        'sort': 'date',
-                        'fromage': '30'
-                    }
-                    
-                    # Use the XML/RSS endpoint
-                    url = f"https://fr.indeed.com/rss?{urlencode(params)}"
-                    
-                    headers = {'User-Agent': 'Mozilla/5.0'}
-                    response = requests.get(url, headers=headers, timeout=10)
-                    
-                    if response.status_code == 200:
-                        jobs = self.parse_indeed_rss(response.text, location)
-                        for job in jobs:
-                            job['source'] = 'Indeed'
-                        all_jobs.extend(jobs)
-                        print(f"   Found {len(jobs)} jobs for {keyword} in {location}")
-                    
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    print(f"   ⚠️ Error with Indeed {keyword}/{location}: {e}")
-        
-        print(f"   ✅ Total Indeed: {len(all_jobs)} jobs")
-        return all_jobs
-    
-    def parse_indeed_rss(self, xml_content: str, location: str) -> List[Dict]:
-        """Parse Indeed RSS feed"""
-        from bs4 import BeautifulSoup
-        import hashlib
-        
-        soup = BeautifulSoup(xml_content, 'xml')
-        jobs = []
         
-        items = soup.find_all('item')
-        
-        for item in items[:20]:  # Limit to 20
+        async def fetch_search(location: str, keyword: str) -> List[Dict]:
             try:
-                title = item.find('title').text if item.find('title') else ''
-                link = item.find('link').text if item.find('link') else ''
-                description = item.find('description').text if item.find('description') else ''
-                pub_date = item.find('pubDate').text if item.find('pubDate') else ''
-                
-                # Extract company from title (format: "Title - Company")
-                parts = title.split(' - ')
-                job_title = parts[0] if parts else title
-                company = parts[1] if len(parts) > 1 else 'À identifier'
+                # Indeed RSS feed (more stable than HTML scraping)
+                params = {
+                    'q': keyword,
+                    'l': location,
+                    'sort': 'date',
+                    'fromage': '30'
+                }
                 
-                job_id = hashlib.md5(link.encode()).hexdigest()[:12]
+                # Use the XML/RSS endpoint
+                url = "https://fr.indeed.com/rss"
                 
-                job_data = {
-                    'id': f"indeed_{job_id}",
-                    'title': job_title,
-                    'company': company,
-                    'location': location,
-                    'link': link,
-                    'posted_date': pub_date,
-                    'description': description[:500]  # Truncate
-                }
+                xml = await self._fetch(session, url, params=params)
                 
-                jobs.append(job_data)
+                jobs = await self.parse_in_pool(parse_indeed_rss, xml, location)
+                for job in jobs:
+                    job['source'] = 'Indeed'
+                print(f"   Found {len(jobs)} jobs for {keyword} in {location}")
+                return jobs
                 
             except Exception as e:
-                continue
+                print(f"   ⚠️ Error with Indeed {keyword}/{location}: {e}")
+                return []
         
-        return jobs
+        locations = ['Paris', 'Lille']
+        
+        results = await asyncio.gather(*[
+            fetch_search(location, keyword)
+            for location in locations
+            for keyword in ['alternance operations', 'alternance supply chain', 'alternance']
+        ])
+        all_jobs = [job for jobs in results for job in jobs]
+        
+        print(f"   ✅ Total Indeed: {len(all_jobs)} jobs")
+        return all_jobs
     
     # ============================================
     # LINKEDIN POSTS via Google - Conservative approach
     # ============================================
     
-    def scrape_linkedin_posts_google(self) -> List[Dict]:
+    async def scrape_linkedin_posts_google(self, session: aiohttp.ClientSession) -> List[Dict]:
         """Search for LinkedIn posts via Google (limited to avoid blocking)"""
         print("\n🟡 Searching LinkedIn posts via Google...")
-        all_jobs = []
+        
+        async def search(query: str) -> List[Dict]:
+            try:
+                url = "https://www.google.com/search"
+                params = {'q': query, 'num': '10'}
+                
+                html = await self._fetch(session, url, params=params)
+                
+                jobs = await self.parse_in_pool(parse_google_results, html)
+                for job in jobs:
+                    job['source'] = 'LinkedIn Post (via Google)'
+                return jobs
+                
+            except Exception as e:
+                print(f"   ⚠️ Error with Google search: {e}")
+                return []
         
         # Only do a few searches to avoid Google blocking
         searches = [
@@ -302,452 +652,398 @@ class MultiSourceJobTracker:
             'site:linkedin.com/feed/update "alternance" "operations"'
         ]
         
-        for query in searches:
-            try:
-                encoded_query = quote_plus(query)
-                url = f"https://www.google.com/search?q={encoded_query}&num=10"
-                
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                }
-                
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    jobs = self.parse_google_results(response.text)
-                    for job in jobs:
-                        job['source'] = 'LinkedIn Post (via Google)'
-                    all_jobs.extend(jobs)
-                
-                time.sleep(5)  # Long delay to be respectful
-                
-            except Exception as e:
-                print(f"   ⚠️ Error with Google search: {e}")
+        results = await asyncio.gather(*[search(query) for query in searches])
+        all_jobs = [job for jobs in results for job in jobs]
         
         print(f"   ✅ Total LinkedIn posts: {len(all_jobs)}")
         return all_jobs
     
-    def parse_google_results(self, html_content: str) -> List[Dict]:
-        """Parse Google search results"""
-        from bs4 import BeautifulSoup
-        import hashlib
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        jobs = []
+    # ============================================
+    # AI ANALYSIS
+    # ============================================
+    
+    async def analyze_jobs_batch(self, jobs: List[Dict]) -> List[Dict]:
+        """Analyze several jobs with a single Gemini prompt"""
         
-        results = soup.find_all('div', class_='g')
+        # Offers go as a JSON array: no escaping issues with scraped text, and compact
+        offers = [
+            {
+                'id': job['id'],
+                'source': job.get('source', 'Unknown'),
+                'titre': job['title'],
+                'entreprise': job['company'],
+                'localisation': job['location'],
+                'description': truncate_utf8(job.get('description') or 'Non disponible', MAX_DESCRIPTION_BYTES),
+                'lien': job.get('link', '')
+            }
+            for job in jobs
+        ]
+        prompt = f"OFFRES À ANALYSER (JSON) :\n{orjson.dumps(offers).decode('utf-8')}"
         
-        for result in results[:5]:  # Only first 5
-            try:
-                title_elem = result.find('h3')
-                link_elem = result.find('a')
-                
-                if title_elem and link_elem:
-                    link = link_elem.get('href', '')
-                    
-                    if 'linkedin.com/posts/' in link or 'linkedin.com/feed/update/' in link:
-                        title = title_elem.text.strip()
-                        
-                        snippet_elem = result.find('div', class_='VwiC3b')
-                        snippet = snippet_elem.text.strip() if snippet_elem else ''
-                        
-                        job_id = hashlib.md5(link.encode()).hexdigest()[:12]
-                        
-                        job_data = {
-                            'id': f"linkedin_post_{job_id}",
-                            'title': title,
-                            'company': 'À identifier',
-                            'location': 'Paris',
-                            'link': link,
-                            'posted_date': '',
-                            'description': snippet
-                        }
-                        
-                        jobs.append(job_data)
+        try:
+            response = await self._generate_with_retry(prompt)
+            results = {str(analysis.pop('id', '')): analysis for analysis in orjson.loads(response.text)}
             
-            except Exception as e:
+        except Exception as e:
+            print(f"   ⚠️ Error analyzing batch: {e}")
+            return [self._error_analysis(str(e)) for _ in jobs]
+        
+        analyses = []
+        for job in jobs:
+            analysis = results.get(job['id'])
+            if analysis is None:
+                analyses.append(self._error_analysis("Offre absente de la réponse"))
+                continue
+            if not is_complete_analysis(analysis):
+                analyses.append(self._error_analysis("Analyse incomplète dans la réponse"))
                 continue
+            
+            analysis['analyzed_at'] = datetime.now().isoformat()
+            analysis['analyzer'] = self.model_name
+            analyses.append(analysis)
         
-        return jobs
+        return analyses
+    
+    async def _generate_with_retry(self, prompt: str):
+        """Call Gemini, backing off when the quota is exhausted (429)"""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return await self.model.generate_content_async(prompt)
+            except google_exceptions.ResourceExhausted:
+                if attempt == MAX_RETRIES:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt))
+    
+    def prefilter_analysis(self, job: Dict):
+        """Low-score analysis for an obviously off-topic offer, None when Gemini should decide"""
+        text = f"{job['title']} {job.get('description', '')}"
+        if ON_TOPIC_RE.search(text) or not OFF_TOPIC_RE.search(text):
+            return None
+        
+        return {
+            "score": 1,
+            "verdict": "Hors sujet (filtre)",
+            "points_forts": [],
+            "points_faibles": ["Métier hors du périmètre recherché"],
+            "recommandation": "Ignorer",
+            "analyzed_at": datetime.now().isoformat(),
+            "analyzer": "filtre"
+        }
+    
+    def _error_analysis(self, error: str) -> Dict:
+        """Placeholder analysis for a job Gemini could not score"""
+        return {
+            "score": 0,
+            "verdict": "Erreur d'analyse",
+            "points_forts": [],
+            "points_faibles": ["Erreur lors de l'analyse IA"],
+            "recommandation": "Analyse manuelle requise",
+            "error": error
+        }
+    
+    async def _analyze_batch_bounded(self, jobs: List[Dict]) -> List[Dict]:
+        """Analyze a batch while staying within Gemini's quota"""
+        async with self.ai_semaphore:
+            async with self.ai_limiter:
+                analyses = await self.analyze_jobs_batch(jobs)
+        
+        for job, analysis in zip(jobs, analyses):
+            self.cache_analysis(job, analysis)
+            self._print_analysis(job, analysis)
+        return analyses
+    
+    def _print_analysis(self, job: Dict, analysis: Dict):
+        print(f"\n🆕 {job['title'][:50]}... at {job['company']} ({job['source']})")
+        print(f"   ✅ Score: {analysis['score']}/10 - {analysis['verdict']}")
+    
+    async def analyze_jobs(self, jobs: List[Dict]) -> List[Dict]:
+        """Analyze jobs from the cache when possible, otherwise in concurrent Gemini batches"""
+        analyses = {}
+        pending = []
+        
+        for job in jobs:
+            analysis = self.prefilter_analysis(job) or self.get_cached_analysis(job)
+            if analysis is None:
+                pending.append(job)
+            else:
+                analyses[job['id']] = analysis
+                self._print_analysis(job, analysis)
+        
+        batches = [pending[i:i + self.ai_batch_size] for i in range(0, len(pending), self.ai_batch_size)]
+        results = await asyncio.gather(*[self._analyze_batch_bounded(batch) for batch in batches])
+        
+        for batch, batch_analyses in zip(batches, results):
+            for job, analysis in zip(batch, batch_analyses):
+                analyses[job['id']] = analysis
+        
+        return [analyses[job['id']] for job in jobs]
     
     # ============================================
-    # AI ANALYSIS (unchanged)
+    # ANALYSIS CACHE
     # ============================================
     
-    def analyze_job_with_ai(self, job: Dict) -> Dict:
-        """Analyze job with Gemini Pro AI"""
+    def load_analysis_cache(self):
+        """Load cached analyses and index their descriptions for near-duplicate lookups"""
+        self.analysis_cache = {}
+        if os.path.exists(self.cache_file):
+            with open(self.cache_file, 'rb') as f:
+                self.analysis_cache = orjson.loads(f.read())
         
-        prompt = f"""
-Analyse cette offre d'alternance et donne un score sur 10 basé sur le profil suivant :
-
-PROFIL DU CANDIDAT :
-- Étudiant SKEMA Business School - Master Project Management & Supply Chain
-- Expérience : Strategy & Operations chez Snap Inc. et papernest
-- Compétences : Data analysis (SQL, Big Query, Looker Studio), Automatisation (Make, Axiom, IA)
-- Langues : Français (natif), Anglais (avancé), Espagnol (B2)
-- Cherche : Alternance en Operations, Supply Chain ou Project Management
-- Préférence : Start-ups/Scale-ups tech, mais ouvert aux grands groupes
-- Localisation : Paris, Région Parisienne, Lille (Remote est un plus)
-
-OFFRE À ANALYSER :
-Source : {job.get('source', 'Unknown')}
-Titre : {job['title']}
-Entreprise : {job['company']}
-Localisation : {job['location']}
-Description : {job.get('description', 'Non disponible')[:1500]}
-Lien : {job.get('link', '')}
-
-CRITÈRES DE SCORING :
-- Match avec le profil (compétences data, automatisation, operations)
-- Type d'entreprise (Start-up/Scale-up = bonus, Grand groupe = acceptable)
-- Mission (opérations, supply chain, project management, data analysis)
-- Opportunités d'apprentissage et technologies utilisées
-- Red flags (stage déguisé, mission floue, surqualification requise)
-
-IMPORTANT : Sois GÉNÉREUX dans les scores. Un score de 7/10 signifie "intéressant à considérer", pas "match parfait".
-- 9-10/10 : Match excellent
-- 7-8/10 : Bon match, à considérer sérieusement  
-- 5-6/10 : Match partiel mais potentiel
-- 3-4/10 : Peu pertinent
-- 0-2/10 : Hors sujet
-
-RETOURNE UNIQUEMENT un JSON avec ce format exact :
-{{
-  "score": 8,
-  "verdict": "Excellente opportunité",
-  "points_forts": ["Match parfait avec data + operations", "Scale-up tech dynamique"],
-  "points_faibles": ["Localisation excentrée"],
-  "recommandation": "Postuler rapidement"
-}}
-"""
+        self.cache_index = MinHashLSH(threshold=0.9, num_perm=128)
+        for key, entry in self.analysis_cache.items():
+            if entry.get('minhash'):
+                self.cache_index.insert(key, MinHash(num_perm=128, hashvalues=entry['minhash']))
+    
+    def save_analysis_cache(self):
+        """Save cached analyses"""
+        with open(self.cache_file, 'wb') as f:
+            f.write(orjson.dumps(self.analysis_cache))
+    
+    def _cache_key(self, job: Dict) -> str:
+        """Exact key: title, company and whitespace-normalized description"""
+        description = ' '.join(job.get('description', '').lower().split())
+        key = f"{job['title'].lower()}|{job['company'].lower()}|{description}"
+        if not description and normalize_text(job['company']) in UNKNOWN_COMPANIES:
+            key += f"|{job['link']}"  # The title alone is too weak a key, only reuse the same offer
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+    
+    def _description_minhash(self, description: str):
+        """MinHash over word 5-grams, None when the description is too short to compare"""
+        words = description.lower().split()
+        if len(words) < 50:
+            return None
         
-        try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0].strip()
-            
-            analysis = json.loads(result_text)
-            analysis['analyzed_at'] = datetime.now().isoformat()
-            analysis['analyzer'] = 'gemini-pro'
-            
-            return analysis
-            
-        except Exception as e:
-            print(f"   ⚠️ Error analyzing: {e}")
-            return {
-                "score": 0,
-                "verdict": "Erreur d'analyse",
-                "points_forts": [],
-                "points_faibles": ["Erreur lors de l'analyse IA"],
-                "recommandation": "Analyse manuelle requise",
-                "error": str(e)
-            }
+        minhash = MinHash(num_perm=128)
+        for i in range(len(words) - 4):
+            minhash.update(' '.join(words[i:i + 5]).encode('utf-8'))
+        return minhash
+    
+    def get_cached_analysis(self, job: Dict):
+        """Reuse the analysis of the same job, or of a repost by the same company with a near-identical description"""
+        entry = self.analysis_cache.get(self._cache_key(job))
+        
+        if entry is None:
+            minhash = self._description_minhash(job.get('description', ''))
+            matches = self.cache_index.query(minhash) if minhash is not None else []
+            # Schools and agencies reuse the same boilerplate for different employers
+            company = normalize_text(job['company'])
+            entry = next((self.analysis_cache[key] for key in matches
+                          if self.analysis_cache[key].get('company') == company), None)
+        
+        if entry is None:
+            return None
+        return {**entry['analysis'], 'analyzer': 'cache'}
+    
+    def cache_analysis(self, job: Dict, analysis: Dict):
+        """Remember a successful analysis for later runs"""
+        key = self._cache_key(job)
+        if 'error' in analysis or key in self.analysis_cache:
+            return
+        
+        minhash = self._description_minhash(job.get('description', ''))
+        self.analysis_cache[key] = {
+            'analysis': analysis,
+            'company': normalize_text(job['company']),
+            'minhash': minhash.hashvalues.tolist() if minhash is not None else None
+        }
+        if minhash is not None:
+            self.cache_index.insert(key, minhash)
     
     # ============================================
     # DATABASE MANAGEMENT
     # ============================================
     
     def load_existing_jobs(self) -> Dict:
-        """Load existing jobs database"""
+        """Load existing jobs database, one JSON job per line"""
+        if not os.path.exists(self.jobs_file) and os.path.exists(self.legacy_jobs_file):
+            self.migrate_legacy_database()
+        
+        jobs = {}
         if os.path.exists(self.jobs_file):
-            with open(self.jobs_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+            with open(self.jobs_file, 'rb') as f:
+                for line in f:
+                    try:
+                        job = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue  # Blank line, or a write cut short by an interrupted run
+                    jobs[job['id']] = job
+        return jobs
     
-    def save_jobs(self, jobs: Dict):
-        """Save jobs to database"""
-        with open(self.jobs_file, 'w', encoding='utf-8') as f:
-            json.dump(jobs, f, indent=2, ensure_ascii=False)
+    def append_jobs(self, jobs: List[Dict]):
+        """Append new jobs to the database, leaving existing lines untouched"""
+        if not jobs:
+            return
+        with open(self.jobs_file, 'a+b') as f:
+            # Start on a fresh line if an interrupted run left a partial one
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write(b''.join(orjson.dumps(job) + b'\n' for job in jobs))
+    
+    def migrate_legacy_database(self):
+        """Convert the former single-document jobs_database.json to JSON lines"""
+        with open(self.legacy_jobs_file, 'rb') as f:
+            jobs = orjson.loads(f.read())
+        self.append_jobs(list(jobs.values()))
+        print(f"📦 Migrated {len(jobs)} jobs from {self.legacy_jobs_file} to {self.jobs_file}")
     
     # ============================================
     # MAIN EXECUTION
     # ============================================
     
-    def run(self):
+    async def run(self):
         """Main execution flow"""
         print("🚀 Starting Multi-Source Job Tracker (Enhanced)...")
         print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
-        all_jobs_db = self.load_existing_jobs()
+        # The database is only needed for dedup once scraping is done, load it meanwhile
+        db_loading = asyncio.create_task(asyncio.to_thread(self.load_existing_jobs))
+        self.load_analysis_cache()
         new_jobs_count = 0
         
-        # Scrape from all sources with error handling
+        # Scrape from all sources with error handling, keeping the first copy of each job
         all_scraped_jobs = []
+        seen_ids = set()
+        scraped_count = 0
         
-        # LinkedIn Jobs (most reliable)
-        try:
-            all_scraped_jobs.extend(self.scrape_linkedin_jobs())
-        except Exception as e:
-            print(f"❌ LinkedIn scraping failed: {e}")
-        
-        # WTTJ (try but don't fail if it doesn't work)
-        try:
-            all_scraped_jobs.extend(self.scrape_wttj_simple())
-        except Exception as e:
-            print(f"⚠️  WTTJ skipped: {e}")
-        
-        # Indeed (try RSS feed)
-        try:
-            all_scraped_jobs.extend(self.scrape_indeed_simple())
-        except Exception as e:
-            print(f"⚠️  Indeed skipped: {e}")
-        
-        # Google/LinkedIn posts (conservative)
-        try:
-            all_scraped_jobs.extend(self.scrape_linkedin_posts_google())
-        except Exception as e:
-            print(f"⚠️  Google search skipped: {e}")
-        
-        print(f"\n📊 Total jobs scraped: {len(all_scraped_jobs)}")
-        
-        # Deduplicate by ID
-        unique_jobs = {job['id']: job for job in all_scraped_jobs}
-        all_scraped_jobs = list(unique_jobs.values())
-        print(f"📊 After deduplication: {len(all_scraped_jobs)} unique jobs")
-        
-        # Process each job
-        for i, job in enumerate(all_scraped_jobs, 1):
-            job_id = job['id']
+        # One session for the whole run: keep-alive connections are reused across requests,
+        # and pages fetched within the last hour (or still fresh per Cache-Control) are not re-downloaded
+        connector = aiohttp.TCPConnector(limit=64, limit_per_host=8, keepalive_timeout=30)
+        http_cache = SQLiteBackend(cache_name=self.http_cache_file, expire_after=3600, cache_control=True)
+        async with CachedSession(cache=http_cache, connector=connector, headers={'User-Agent': USER_AGENT}) as session:
+            # The sources hit independent hosts, scrape them all at once
+            sources = [
+                (self.scrape_linkedin_jobs, "❌ LinkedIn scraping failed"),  # most reliable
+                (self.scrape_wttj_simple, "⚠️  WTTJ skipped"),
+                (self.scrape_indeed_simple, "⚠️  Indeed skipped"),  # RSS feed
+                (self.scrape_linkedin_posts_google, "⚠️  Google search skipped"),
+            ]
+            # Pages are parsed in worker processes while the other downloads go on. Workers are
+            # spawned, not forked: the database loader and the cache's sqlite threads are running
+            self.parse_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+            try:
+                results = await asyncio.gather(
+                    *(scrape(session) for scrape, _ in sources),
+                    return_exceptions=True
+                )
+            finally:
+                self.parse_pool.shutdown()
+                self.parse_pool = None
             
-            if job_id in all_jobs_db:
-                continue
+            # One failing source must not take the others down
+            for (_, failure), result in zip(sources, results):
+                if isinstance(result, Exception):
+                    print(f"{failure}: {result}")
+                else:
+                    scraped_count += len(result)
+                    self._merge(all_scraped_jobs, seen_ids, result)
             
-            print(f"\n🆕 [{i}/{len(all_scraped_jobs)}] {job['title'][:50]}... at {job['company']} ({job['source']})")
-            print(f"   🤖 Analyzing...")
+            print(f"\n📊 Total jobs scraped: {scraped_count}")
+            print(f"📊 After deduplication: {len(all_scraped_jobs)} unique jobs")
             
-            analysis = self.analyze_job_with_ai(job)
-            job['analysis'] = analysis
-            job['found_at'] = datetime.now().isoformat()
+            all_jobs_db = await db_loading
+            new_jobs = [job for job in all_scraped_jobs if job['id'] not in all_jobs_db]
             
-            all_jobs_db[job_id] = job
-            new_jobs_count += 1
+            # The same offer is often posted on several boards, only one copy is analyzed
+            representatives = self.collapse_duplicates(new_jobs)
             
-            print(f"   ✅ Score: {analysis['score']}/10 - {analysis['verdict']}")
+            # Fetch every missing description before any AI call
+            await self.fetch_missing_descriptions(session, representatives)
+        
+        # Analyze all new jobs concurrently
+        print(f"\n🤖 Analyzing {len(representatives)} new jobs...")
+        analyses = dict(zip(
+            (job['id'] for job in representatives),
+            await self.analyze_jobs(representatives)
+        ))
+        
+        for job in new_jobs:
+            job['analysis'] = analyses[job.get('duplicate_of', job['id'])]
+            job['found_at'] = datetime.now().isoformat()
             
-            time.sleep(2)
+            all_jobs_db[job['id']] = job
+            new_jobs_count += 1
         
-        self.save_jobs(all_jobs_db)
+        self.append_jobs(new_jobs)
+        self.save_analysis_cache()
         
         print(f"\n✨ Done! Found {new_jobs_count} new jobs")
         print(f"📁 Total jobs in database: {len(all_jobs_db)}")
         
         self.generate_report(all_jobs_db)
     
+    def collapse_duplicates(self, jobs: List[Dict]) -> List[Dict]:
+        """Keep the first copy of each (company, title) offer, marking its copies on other boards as duplicates"""
+        representatives = []
+        first_by_key = {}
+        
+        for job in jobs:
+            company = normalize_text(job['company'])
+            if company in UNKNOWN_COMPANIES:
+                representatives.append(job)  # Without a company the title alone is too weak a key
+                continue
+            
+            key = (company, normalize_text(job['title'])[:40])
+            first = first_by_key.setdefault(key, job)
+            if first is job or first['source'] == job['source']:
+                representatives.append(job)  # Two IDs from the same board are two distinct postings
+            else:
+                first.setdefault('duplicates', []).append(job['id'])
+                job['duplicate_of'] = first['id']
+        
+        if len(representatives) < len(jobs):
+            print(f"📊 Cross-source duplicates: {len(jobs) - len(representatives)}, analyzed once")
+        return representatives
+    
+    def _merge(self, all_jobs: List[Dict], seen_ids: set, jobs: List[Dict]):
+        """Append the jobs whose ID has not been seen yet"""
+        for job in jobs:
+            if job['id'] not in seen_ids:
+                seen_ids.add(job['id'])
+                all_jobs.append(job)
+    
     def generate_report(self, all_jobs: Dict):
-        """Generate HTML report - same as before"""
+        """Generate HTML report from templates/report.html.j2"""
         
         jobs_list = list(all_jobs.values())
         jobs_list.sort(key=lambda x: x.get('analysis', {}).get('score', 0), reverse=True)
         
         top_jobs = jobs_list
         
-        html = f"""
-<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Multi-Source Job Tracker - Théo Collin</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            min-height: 100vh;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; }}
-        .header {{
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .header h1 {{ color: #2d3748; font-size: 28px; margin-bottom: 10px; }}
-        .header p {{ color: #718096; font-size: 14px; }}
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }}
-        .stat-card {{
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .stat-card h3 {{ font-size: 32px; color: #667eea; margin-bottom: 5px; }}
-        .stat-card p {{ color: #718096; font-size: 14px; }}
-        .job-card {{
-            background: white;
-            padding: 25px;
-            border-radius: 10px;
-            margin-bottom: 15px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            transition: transform 0.2s;
-        }}
-        .job-card:hover {{ transform: translateY(-2px); box-shadow: 0 6px 12px rgba(0,0,0,0.15); }}
-        .job-header {{ display: flex; justify-content: space-between; align-items: start; margin-bottom: 15px; }}
-        .job-title {{ font-size: 20px; color: #2d3748; font-weight: 600; margin-bottom: 5px; }}
-        .job-company {{ color: #667eea; font-size: 16px; margin-bottom: 5px; }}
-        .job-location {{ color: #718096; font-size: 14px; }}
-        .source-badge {{
-            background: #edf2f7;
-            color: #4a5568;
-            padding: 4px 12px;
-            border-radius: 12px;
-            font-size: 12px;
-            margin-top: 5px;
-            display: inline-block;
-        }}
-        .score-badge {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 18px;
-            font-weight: bold;
-        }}
-        .score-badge.high {{ background: linear-gradient(135deg, #48bb78 0%, #38a169 100%); }}
-        .score-badge.medium {{ background: linear-gradient(135deg, #ed8936 0%, #dd6b20 100%); }}
-        .score-badge.low {{ background: linear-gradient(135deg, #f56565 0%, #e53e3e 100%); }}
-        .verdict {{ font-size: 16px; color: #2d3748; font-weight: 500; margin-bottom: 15px; }}
-        .points {{ display: grid; grid-template-columns: 1fr 1fr; gap: 15px; margin-bottom: 15px; }}
-        .points-section {{ background: #f7fafc; padding: 15px; border-radius: 8px; }}
-        .points-section h4 {{ font-size: 14px; color: #2d3748; margin-bottom: 10px; text-transform: uppercase; }}
-        .points-section ul {{ list-style: none; padding-left: 0; }}
-        .points-section li {{ padding: 5px 0; color: #4a5568; font-size: 14px; }}
-        .points-section li:before {{ content: "• "; color: #667eea; font-weight: bold; margin-right: 5px; }}
-        .recommendation {{ background: #edf2f7; padding: 12px 16px; border-radius: 8px; color: #2d3748; font-size: 14px; margin-bottom: 15px; }}
-        .job-link {{
-            display: inline-block;
-            background: #667eea;
-            color: white;
-            padding: 10px 20px;
-            border-radius: 6px;
-            text-decoration: none;
-            font-weight: 500;
-            transition: background 0.2s;
-        }}
-        .job-link:hover {{ background: #5568d3; }}
-        .footer {{ text-align: center; color: white; margin-top: 30px; font-size: 14px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🎯 Multi-Source Job Tracker</h1>
-            <p>Sources : LinkedIn Jobs, Welcome to the Jungle, Indeed, LinkedIn Posts</p>
-            <p>Dernière mise à jour : {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
-        </div>
-        
-        <div class="stats">
-            <div class="stat-card">
-                <h3>{len(all_jobs)}</h3>
-                <p>Offres totales</p>
-            </div>
-            <div class="stat-card">
-                <h3>{len([j for j in jobs_list if j.get('analysis', {}).get('score', 0) >= 7])}</h3>
-                <p>Score ≥7/10</p>
-            </div>
-            <div class="stat-card">
-                <h3>{len([j for j in jobs_list if j.get('analysis', {}).get('score', 0) >= 8])}</h3>
-                <p>Score ≥8/10</p>
-            </div>
-            <div class="stat-card">
-                <h3>{len([j for j in jobs_list if j.get('source') == 'LinkedIn Jobs'])}</h3>
-                <p>LinkedIn Jobs</p>
-            </div>
-            <div class="stat-card">
-                <h3>{len([j for j in jobs_list if j.get('source') == 'Welcome to the Jungle'])}</h3>
-                <p>WTTJ</p>
-            </div>
-            <div class="stat-card">
-                <h3>{len([j for j in jobs_list if j.get('source') == 'Indeed'])}</h3>
-                <p>Indeed</p>
-            </div>
-            <div class="stat-card">
-                <h3>{len([j for j in jobs_list if 'LinkedIn Post' in j.get('source', '')])}</h3>
-                <p>Posts LinkedIn</p>
-            </div>
-        </div>
-"""
+        # Score buckets and per-source counts in a single pass
+        score_7 = score_8 = 0
+        sources = Counter()
+        for job in jobs_list:
+            score = job.get('analysis', {}).get('score', 0)
+            score_7 += score >= 7
+            score_8 += score >= 8
+            sources[job.get('source', '')] += 1
         
-        if top_jobs:
-            html += "<h2 style='color: white; margin: 20px 0;'>🌟 Toutes les opportunités</h2>"
-            
-            for job in top_jobs:
-                analysis = job.get('analysis', {})
-                score = analysis.get('score', 0)
-                score_class = 'high' if score >= 8 else 'medium' if score >= 5 else 'low'
-                
-                html += f"""
-        <div class="job-card">
-            <div class="job-header">
-                <div>
-                    <div class="job-title">{job['title']}</div>
-                    <div class="job-company">{job['company']}</div>
-                    <div class="job-location">📍 {job['location']}</div>
-                    <span class="source-badge">🔗 {job.get('source', 'Unknown')}</span>
-                </div>
-                <div class="score-badge {score_class}">{score}/10</div>
-            </div>
-            
-            <div class="verdict">💡 {analysis.get('verdict', 'N/A')}</div>
-            
-            <div class="points">
-                <div class="points-section">
-                    <h4>✅ Points forts</h4>
-                    <ul>
-"""
-                
-                for point in analysis.get('points_forts', []):
-                    html += f"<li>{point}</li>"
-                
-                html += """
-                    </ul>
-                </div>
-                <div class="points-section">
-                    <h4>⚠️ Points faibles</h4>
-                    <ul>
-"""
-                
-                for point in analysis.get('points_faibles', []):
-                    html += f"<li>{point}</li>"
-                
-                html += f"""
-                    </ul>
-                </div>
-            </div>
-            
-            <div class="recommendation">
-                🎯 <strong>Recommandation :</strong> {analysis.get('recommandation', 'N/A')}
-            </div>
-            
-            <a href="{job.get('link', '#')}" class="job-link" target="_blank">Voir l'offre →</a>
-        </div>
-"""
-        
-        html += """
-        <div class="footer">
-            <p>Développé avec ❤️ par Théo Collin | Multi-source scraping + Gemini Pro AI</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
+        stats = {
+            'total': len(all_jobs),
+            'score_7': score_7,
+            'score_8': score_8,
+            'linkedin': sources['LinkedIn Jobs'],
+            'wttj': sources['Welcome to the Jungle'],
+            'indeed': sources['Indeed'],
+            'posts': sum(count for source, count in sources.items() if 'LinkedIn Post' in source)
+        }
         
-        with open('index.html', 'w', encoding='utf-8') as f:
-            f.write(html)
+        self.report_template.stream(
+            top_jobs=top_jobs,
+            stats=stats,
+            now=datetime.now()
+        ).dump('index.html', encoding='utf-8')
         
         print(f"\n📊 Report generated: index.html")
 
 if __name__ == "__main__":
+    try:
+        import uvloop  # Not available on Windows, asyncio's default loop is used there
+        uvloop.install()
+    except ImportError:
+        pass
+    
     tracker = MultiSourceJobTracker()
-    tracker.run()
+    asyncio.run(tracker.run())